@@ -1,6 +1,16 @@
-from typing import Any
+from typing import Any, Callable, Iterator, Literal
+from collections import OrderedDict, namedtuple
+from copy import copy
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from uuid import uuid4
 import inspect
+import io
+import json
+import threading
 
+from psycopg2.extras import execute_values
 from pydantic import BaseModel
 from sqlalchemy import (
     Table,
@@ -17,12 +27,84 @@ from sqlalchemy import (
     bindparam,
     ForeignKey,
     Index,
+    and_,
 )
+from sqlalchemy.engine import Connection, Row
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql import sqltypes
 from sqlalchemy.inspection import inspect as sa_inspect
 
 
+_OPERATORS: dict[str, Callable[[Column, Any], Any]] = {
+    'in': lambda c, v: c.in_(v),
+    'not in': lambda c, v: c.notin_(v),
+    'like': lambda c, v: c.like(v),
+    'not like': lambda c, v: c.notlike(v),
+    'is null': lambda c, _v: c.is_(None),
+    'is not null': lambda c, _v: c.isnot(None),
+    'between': lambda c, v: c.between(v[0], v[1]),
+    'not between': lambda c, v: ~c.between(v[0], v[1]),
+}
+
+ResultType = Literal['dict', 'mapping', 'namedtuple']
+
+
+def _row_factory(keys: list[str], result_type: ResultType) -> Callable[[Row], Any]:
+    if result_type == 'dict':
+        return lambda row: dict(row._mapping)
+    if result_type == 'mapping':
+        return lambda row: row._mapping
+    if result_type == 'namedtuple':
+        return namedtuple('Row', keys, rename=True)._make
+    raise ValueError(f'Unknown result_type {result_type!r}')
+
+
+def _cast_type(type_: Any) -> Any:
+    # An explicit cast to varchar(n) or numeric(p, s) truncates or rounds silently,
+    # so cast to the bare type and leave length checks to the column assignment.
+    if isinstance(type_, sqltypes.TypeDecorator):
+        return _cast_type(type_.impl)
+    type_ = copy(type_)
+    for attr in ('length', 'precision', 'scale'):
+        if getattr(type_, attr, None) is not None:
+            setattr(type_, attr, None)
+    if isinstance(type_, sqltypes.ARRAY):
+        type_.item_type = _cast_type(type_.item_type)
+    return type_
+
+
+def _copy_quote(value: str) -> str:
+    # Unquoted empty fields are NULL in COPY's CSV format, quoted ones are ''.
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _copy_array(value: list | tuple) -> str:
+    items = []
+    for v in value:
+        if v is None:
+            items.append('NULL')
+        elif isinstance(v, (list, tuple)):
+            items.append(_copy_array(v))
+        else:
+            items.append('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"')
+    return '{' + ','.join(items) + '}'
+
+
+def _copy_renderer(type_: Any) -> Callable[[Any], str]:
+    # Render values the way upsert() would bind them for the column's type.
+    if isinstance(type_, sqltypes.JSON):
+        if not type_.none_as_null:
+            return lambda v: _copy_quote(json.dumps(v))
+        encode = json.dumps
+    elif isinstance(type_, sqltypes.ARRAY):
+        encode = _copy_array
+    elif isinstance(type_, sqltypes.LargeBinary):
+        encode = lambda v: '\\x' + bytes(v).hex()
+    else:
+        encode = str
+    return lambda v: '' if v is None else _copy_quote(encode(v))
+
 
 class Database:
     class ColumnModel(BaseModel):
@@ -36,18 +118,46 @@ class Database:
         class Config:
             arbitrary_types_allowed = True
 
-    def __init__(self, db_url: str, schema: str = 'public'):
+    STATEMENT_CACHE_SIZE = 32
+
+    def __init__(
+        self,
+        db_url: str,
+        schema: str = 'public',
+        pool_size: int = 10,
+        max_overflow: int = 20,
+    ):
         self.db_url = db_url
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self._metadata = MetaData()
+        self._statements: OrderedDict[tuple, Any] = OrderedDict()
+        self._statements_lock = threading.Lock()
         self.create_engine_from_url(db_url, schema)
 
     def create_engine_from_url(self, db_url: str, schema: str):
         try:
-            self.engine = create_engine(db_url, pool_pre_ping=True)
+            self.engine = create_engine(
+                db_url,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_pre_ping=True,
+                future=True,
+            )
             self.schema = schema
             self.execute_raw('select 1 as is_alive;')
         except Exception as e:
             raise ValueError(f'Could not connect to database: {e}')
 
+    @contextmanager
+    def _conn(self, conn: Connection | None = None) -> Iterator[Connection]:
+        # External connections are left to the caller to commit or roll back.
+        if conn is not None:
+            yield conn
+        else:
+            with self.engine.begin() as c:
+                yield c
+
     def __str__(self) -> str:
         return f'Database({self.engine})'
 
@@ -56,28 +166,168 @@ class Database:
             .parameters.keys()}
         return f'<Database {params}>'
 
-    def get_table(self, table_name: str) -> Table:
-        return Table(
-            table_name,
-            MetaData(),
-            autoload=True,
-            autoload_with=self.engine,
-            schema=self.schema
+    def get_table(self, table_name: str, conn: Connection | None = None) -> Table:
+        return self._get_table(self.schema, table_name, conn)
+
+    def _get_table(
+        self,
+        schema: str,
+        table_name: str,
+        conn: Connection | None = None,
+    ) -> Table:
+        # Reusing one Table object per name keeps SQLAlchemy's compiled cache warm.
+        table = self._metadata.tables.get(f'{schema}.{table_name}')
+        if table is None and conn is not None:
+            # Reflect through the caller's connection so uncommitted DDL on it is
+            # seen, but keep it out of the registry in case the caller rolls back.
+            table = Table(table_name, MetaData(), autoload_with=conn, schema=schema)
+        elif table is None:
+            table = Table(
+                table_name,
+                self._metadata,
+                autoload_with=self.engine,
+                schema=schema
+            )
+        return table
+
+    def _invalidate_table(self, table_name: str) -> None:
+        table = self._metadata.tables.get(f'{self.schema}.{table_name}')
+        if table is not None:
+            self._metadata.remove(table)
+        with self._statements_lock:
+            self._statements = OrderedDict(
+                (k, v) for k, v in self._statements.items()
+                if k[1:3] != (self.schema, table_name)
+            )
+
+    def _statement(
+        self,
+        table: Table,
+        key: tuple,
+        build: Callable[[], Any],
+        variant: Any = None,
+    ) -> Any:
+        # Keys are (operation, schema, table_name, ...) so invalidation can drop a
+        # single table's statements. Each key holds one variant; building another
+        # replaces it. Least recently used keys are evicted.
+        if self._metadata.tables.get(table.fullname) is not table:
+            # Tables reflected through a caller's connection are never cached.
+            return build()
+        with self._statements_lock:
+            entry = self._statements.get(key)
+            if entry is not None and entry[0] == variant:
+                self._statements.move_to_end(key)
+                return entry[1]
+        stmt = build()
+        with self._statements_lock:
+            self._statements[key] = (variant, stmt)
+            self._statements.move_to_end(key)
+            if len(self._statements) > self.STATEMENT_CACHE_SIZE:
+                self._statements.popitem(last=False)
+        return stmt
+
+    def _upsert_stmt(
+        self,
+        table: Table,
+        keys: tuple[str, ...],
+        rows: int,
+        chunk_size: int,
+        overwrite_with_null: bool,
+    ) -> Any:
+        # A multi-row VALUES insert rather than executemany: psycopg2 drops the
+        # RETURNING rows of ON CONFLICT statements sent through executemany.
+        # The statement depends on the row count and holds rows * len(keys)
+        # bind params, so only the chunk_size shape and the most recent tail
+        # shape are kept per (table, keys, overwrite_with_null).
+        def build():
+            stmt = insert(table).values([
+                {k: bindparam(f'_{i}_{k}', type_=table.c[k].type) for k in keys}
+                for i in range(rows)
+            ])
+            return self._on_conflict(stmt, table, keys, overwrite_with_null)
+        shape = 'full' if rows == chunk_size else 'tail'
+        return self._statement(
+            table,
+            ('upsert', table.schema, table.name, keys, overwrite_with_null, shape),
+            build,
+            variant=rows,
+        )
+
+    def _on_conflict(
+        self,
+        stmt: Any,
+        table: Table,
+        keys: list[str] | tuple[str, ...],
+        overwrite_with_null: bool,
+    ) -> Any:
+        def build():
+            index = [key.name for key in sa_inspect(table).primary_key]
+            excluded = insert(table).excluded
+            set_ = {
+                k: (excluded[k] if overwrite_with_null else \
+                func.coalesce(excluded[k], table.c[k])) for k in keys
+            }
+            return index, set_, [table.c[c] for c in index]
+        index, set_, returning = self._statement(
+            table,
+            ('conflict', table.schema, table.name, tuple(keys), overwrite_with_null),
+            build
+        )
+        stmt = stmt.on_conflict_do_update(index_elements=index, set_=set_)
+        return stmt.returning(*returning)
+
+    def _update_stmt(
+        self,
+        table: Table,
+        on: tuple[str, ...],
+        keys: tuple[str, ...],
+    ) -> Any:
+        def build():
+            stmt = update(table).returning(*[table.c[c] for c in on])
+            for column in on:
+                stmt = stmt.where(table.c[column] == bindparam(f"_{column}"))
+            return stmt.values({k: bindparam(k) for k in keys})
+        return self._statement(
+            table,
+            ('update', table.schema, table.name, on, keys),
+            build
         )
     
-    def check_table_exists(self, table_name: str, schema: str | None = None):
-        with self.engine.connect() as conn:
-            return conn.dialect.has_table(conn, table_name, schema=schema or self.schema)
+    def check_table_exists(
+        self,
+        table_name: str,
+        schema: str | None = None,
+        conn: Connection | None = None,
+    ):
+        with self._conn(conn) as c:
+            return c.dialect.has_table(c, table_name, schema=schema or self.schema)
     
-    def get_table_columns(self, table_name: str) -> list[str]:
-        return [c.name for c in self.get_table(table_name).columns]
+    def get_table_columns(
+        self,
+        table_name: str,
+        conn: Connection | None = None,
+    ) -> list[str]:
+        return [c.name for c in self.get_table(table_name, conn=conn).columns]
 
-    def get_table_count(self, table_name: str) -> int | None:
-        table = self.get_table(table_name)
-        stmt = select([func.count()]).select_from(table)
-        with self.engine.connect() as conn:
-            count = conn.execute(stmt).scalar()
-        return count
+    def get_table_count(
+        self,
+        table_name: str,
+        exact: bool = True,
+        conn: Connection | None = None,
+    ) -> int | None:
+        if exact:
+            stmt = select(func.count()).select_from(self.get_table(table_name, conn=conn))
+            params = {}
+        else:
+            # Planner estimate from pg_class: O(1), refreshed by VACUUM/ANALYZE.
+            stmt = text(
+                'SELECT reltuples::bigint AS count FROM pg_class WHERE oid = to_regclass(:t)'
+            )
+            params = {'t': f'{self.schema}."{table_name}"'}
+        with self._conn(conn) as c:
+            count = c.execute(stmt, params).scalar()
+        # reltuples is -1 for tables that have never been analyzed.
+        return count if count is None or count >= 0 else None
 
     def get_tables(self, schema: str | None = None) -> list[str]:
         return sa_inspect(self.engine).get_table_names(schema=schema or self.schema)
@@ -92,28 +342,114 @@ class Database:
         chunk_size: int = 1_000,
         verbose: bool = False,
         overwrite_with_null: bool = False,
+        parallel: bool = False,
+        conn: Connection | None = None,
     ) -> list[dict] | dict:
-        table = self.get_table(table_name)
+        if parallel and conn is not None:
+            raise ValueError('Parallel upserts check out their own connections')
+        table = self.get_table(table_name, conn=conn)
         index = [key.name for key in sa_inspect(table).primary_key]
         if not index:
             raise Exception(f'No primary key found for table {table_name}')
-        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]\
-            if isinstance(data, list) else [[data]]
-        results = []
-        for number, chunk in enumerate(chunks):
+        # Consecutive rows sharing a key set are chunked together so each chunk
+        # maps onto one cached statement.
+        rows = data if isinstance(data, list) else [data]
+        chunks = []
+        for keys, group in groupby(rows, key=lambda r: tuple(sorted(r.keys()))):
+            group = list(group)
+            chunks.extend(
+                (keys, group[i:i + chunk_size]) for i in range(0, len(group), chunk_size)
+            )
+
+        def load(number: int, keys: tuple[str, ...], chunk: list[dict], c: Connection):
             if verbose:
                 print(f'Loading chunk {number + 1} of {len(chunks)}')
-            stmt = insert(table).values(chunk).returning(*[table.c[c] for c in index])
-            stmt = stmt.on_conflict_do_update(
-                index_elements=index,
-                set_={
-                    k: (stmt.excluded[k] if overwrite_with_null else \
-                    func.coalesce(stmt.excluded[k], table.c[k])) for k in chunk[0].keys()
-                }
+            stmt = self._upsert_stmt(
+                table,
+                keys,
+                len(chunk),
+                chunk_size,
+                overwrite_with_null,
             )
-            with self.engine.connect() as conn:
-                res = conn.execute(stmt)
-            results.extend([r._asdict() for r in res.fetchall()])
+            params = {f'_{i}_{k}': row[k] for i, row in enumerate(chunk) for k in keys}
+            return [r._asdict() for r in c.execute(stmt, params).fetchall()]
+
+        def load_parallel(args: tuple[int, tuple[tuple[str, ...], list[dict]]]):
+            number, (keys, chunk) = args
+            # Each chunk commits on its own pooled connection.
+            with self._conn() as c:
+                return load(number, keys, chunk, c)
+
+        results = []
+        if parallel:
+            workers = max(1, min(self.pool_size, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for rows in executor.map(load_parallel, enumerate(chunks)):
+                    results.extend(rows)
+        else:
+            with self._conn(conn) as c:
+                for number, (keys, chunk) in enumerate(chunks):
+                    results.extend(load(number, keys, chunk, c))
+        return results[0] if isinstance(data, dict) else results
+
+    def upsert_copy(
+        self,
+        table_name: str,
+        data: dict | list[dict],
+        verbose: bool = False,
+        overwrite_with_null: bool = False,
+        conn: Connection | None = None,
+    ) -> list[dict] | dict:
+        if self.engine.dialect.name != 'postgresql':
+            return self.upsert(
+                table_name,
+                data,
+                verbose=verbose,
+                overwrite_with_null=overwrite_with_null,
+                conn=conn,
+            )
+        table = self.get_table(table_name, conn=conn)
+        if not sa_inspect(table).primary_key:
+            raise Exception(f'No primary key found for table {table_name}')
+        rows = [data] if isinstance(data, dict) else data
+        if not rows:
+            return []
+        preparer = self.engine.dialect.identifier_preparer
+
+        def load(keys: tuple[str, ...], group: list[dict], c: Connection) -> list[dict]:
+            staging = Table(
+                f'_stg_{uuid4().hex}',
+                MetaData(),
+                *[Column(k, table.c[k].type) for k in keys],
+                prefixes=['TEMPORARY'],
+                postgresql_on_commit='DROP',
+            )
+            renderers = [(k, _copy_renderer(table.c[k].type)) for k in keys]
+            buffer = io.StringIO()
+            for row in group:
+                buffer.write(','.join(render(row[k]) for k, render in renderers) + '\n')
+            buffer.seek(0)
+            copy_sql = f'''
+                COPY {preparer.format_table(staging)} ({', '.join(preparer.quote(k) for k in keys)})
+                FROM STDIN WITH (FORMAT CSV)
+            '''
+            stmt = insert(table).from_select(keys, select([staging.c[k] for k in keys]))
+            stmt = self._on_conflict(stmt, table, keys, overwrite_with_null)
+            if verbose:
+                print(copy_sql)
+                print(stmt.compile(self.engine))
+            staging.create(c)
+            with c.connection.cursor() as cursor:
+                cursor.copy_expert(copy_sql, buffer)
+            return [r._asdict() for r in c.execute(stmt).fetchall()]
+
+        # As in upsert, only columns present in a row are written: consecutive
+        # rows sharing a key set get their own staging table and INSERT ... SELECT,
+        # so missing keys keep their defaults or existing values instead of NULL.
+        results = []
+        with self._conn(conn) as c:
+            for keys, group in groupby(rows, key=lambda r: tuple(sorted(r.keys()))):
+                results.extend(load(keys, list(group), c))
         return results[0] if isinstance(data, dict) else results
 
     def create_table(
@@ -125,18 +461,19 @@ class Database:
         indexes: list[str] | None = None,
         check_existing: bool = True,
         verbose: bool = False,
+        conn: Connection | None = None,
     ) -> None:
-        if check_existing and self.check_table_exists(table_name):
-            existing_columns = self.get_table_columns(table_name)
+        if check_existing and self.check_table_exists(table_name, conn=conn):
+            existing_columns = set(self.get_table_columns(table_name, conn=conn))
             missing_columns = [
                 (m.name, m.type) for m in mappings if m.name not in existing_columns
             ]
-            for column in missing_columns:
-                self.add_column(
+            if missing_columns:
+                self.add_columns(
                     table_name=table_name,
-                    column_name=column[0],
-                    column_type=column[1],
+                    columns=missing_columns,
                     verbose=verbose,
+                    conn=conn,
                 )
         else:
             args = []
@@ -161,7 +498,9 @@ class Database:
                 for column in indexes:
                     args.append(Index(f'{table_name}_{column}_idx', column))
             table = Table(table_name, MetaData(), schema=self.schema, *args)
-            table.create(self.engine, checkfirst=check_existing)
+            with self._conn(conn) as c:
+                table.create(c, checkfirst=check_existing)
+            self._invalidate_table(table_name)
             if verbose:
                 stmt = CreateTable(
                     table,
@@ -175,45 +514,53 @@ class Database:
         column_name: str,
         column_type: Any,
         verbose: bool = False,
+        conn: Connection | None = None,
+    ):
+        self.add_columns(
+            table_name=table_name,
+            columns=[(column_name, column_type)],
+            verbose=verbose,
+            conn=conn,
+        )
+
+    def add_columns(
+        self,
+        table_name: str,
+        columns: list[tuple[str, Any]],
+        verbose: bool = False,
+        conn: Connection | None = None,
     ):
-        new_column = Column(column_name, column_type)
-        dialect_type = new_column.type.compile(self.engine.dialect)
+        # One ALTER TABLE takes the lock and rewrites the catalog once for all columns.
+        additions = ', '.join(
+            f'ADD COLUMN "{name}" {Column(name, type_).type.compile(self.engine.dialect)}'
+            for name, type_ in columns
+        )
         query = f'''
             ALTER TABLE {self.schema}."{table_name}"
-            ADD COLUMN "{new_column.name}" {dialect_type}
+            {additions}
             ;
         '''
         if verbose:
             print(query)
-        with self.engine.connect() as conn:
-            conn.execute(query)
+        with self._conn(conn) as c:
+            c.execute(text(query))
+        self._invalidate_table(table_name)
 
     def _where_clause(self, stmt: Any, table: Table, where: list[dict] | dict):
         where = [where] if isinstance(where, dict) else where
+        predicates = []
         for w in where:
             for k, v in w.items():
                 if isinstance(v, dict):
-                    if v['operator'].lower() == 'in':
-                        stmt = stmt.where(table.c[k].in_(v['value']))
-                    elif v['operator'].lower() == 'not in':
-                        stmt = stmt.where(table.c[k].notin_(v['value']))
-                    elif v['operator'].lower() == 'like':
-                        stmt = stmt.where(table.c[k].like(v['value']))
-                    elif v['operator'].lower() == 'not like':
-                        stmt = stmt.where(table.c[k].notlike(v['value']))
-                    elif v['operator'].lower() == 'is null':
-                        stmt = stmt.where(table.c[k].is_(None))
-                    elif v['operator'].lower() == 'is not null':
-                        stmt = stmt.where(table.c[k].isnot(None))
-                    elif v['operator'].lower() == 'between':
-                        stmt = stmt.where(table.c[k].between(v['value'][0], v['value'][1]))
-                    elif v['operator'].lower() == 'not between':
-                        stmt = stmt.where(~table.c[k].between(v['value'][0], v['value'][1]))
-                    else:
-                        stmt = stmt.where(table.c[k].op(v['operator'])(v['value']))
+                    operator = v['operator']
+                    fn = _OPERATORS.get(operator.casefold())
+                    predicates.append(
+                        fn(table.c[k], v.get('value')) if fn else \
+                        table.c[k].op(operator)(v['value'])
+                    )
                 else:
-                    stmt = stmt.where(table.c[k] == v)
-        return stmt
+                    predicates.append(table.c[k] == v)
+        return stmt.where(and_(*predicates)) if predicates else stmt
 
     def get(
         self,
@@ -225,8 +572,37 @@ class Database:
         sort_by: str | None = None,
         ascending: bool = True,
         verbose: bool = False,
-    ) -> list[dict]:
-        table = self.get_table(table_name)
+        result_type: ResultType = 'dict',
+        conn: Connection | None = None,
+    ) -> list[Any]:
+        return list(self.iter_get(
+            table_name,
+            columns=columns,
+            where=where,
+            limit=limit,
+            offset=offset,
+            sort_by=sort_by,
+            ascending=ascending,
+            verbose=verbose,
+            result_type=result_type,
+            conn=conn,
+        ))
+
+    def iter_get(
+        self,
+        table_name: str,
+        columns: list[str] | None = None,
+        where: list[dict] | dict | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        sort_by: str | None = None,
+        ascending: bool = True,
+        verbose: bool = False,
+        batch_size: int = 1_000,
+        result_type: ResultType = 'mapping',
+        conn: Connection | None = None,
+    ) -> Iterator[Any]:
+        table = self.get_table(table_name, conn=conn)
         stmt = select([table.c[c] for c in columns] if columns else table.c)
         if where:
             stmt = self._where_clause(stmt, table, where)
@@ -238,59 +614,128 @@ class Database:
             )
         if limit:
             stmt = stmt.limit(limit)
-        results = []
-        with self.engine.connect() as conn:
-            for row in conn.execute(stmt).mappings():
-                results.append(dict(row))
         if verbose:
-            stmt = stmt.compile(self.engine)
-            print(stmt)
-        return results
+            print(stmt.compile(self.engine))
+        # The connection stays checked out until the generator is exhausted.
+        with self._conn(conn) as c:
+            # Options go on the statement: in future mode Connection.execution_options
+            # mutates the connection, which may belong to the caller.
+            result = c.execute(stmt.execution_options(
+                stream_results=True,
+                yield_per=batch_size,
+            ))
+            make_row = _row_factory(list(result.keys()), result_type)
+            for partition in result.partitions(batch_size):
+                yield from map(make_row, partition)
 
     def update(
         self,
         table_name: str,
         data: dict | list[dict],
         on: str | list[str],
+        conn: Connection | None = None,
     ) -> int:
-        table = self.get_table(table_name)
         on = [on] if isinstance(on, str) else on
         data = [data] if isinstance(data, dict) else data
-        stmt = update(table).returning(*[table.c[c] for c in on])
-        for column in on:
-            stmt = stmt.where(table.c[column] == bindparam(f"_{column}"))
-        values = {k: bindparam(k) for k in data[0] if k not in on}
-        stmt = stmt.values(values)
-        for record in data:
-            for column in on:
-                record[f"_{column}"] = record.pop(column)
-        with self.engine.connect() as conn:
-            res = conn.execute(stmt, data)
+        on_set = set(on)
+        stmt = self._update_stmt(
+            self.get_table(table_name, conn=conn),
+            tuple(on),
+            tuple(sorted(k for k in data[0] if k not in on_set)),
+        )
+        # Key columns are bound as _<column> so they don't clash with the SET params.
+        params = [
+            {
+                **{k: v for k, v in record.items() if k not in on_set},
+                **{f"_{column}": record[column] for column in on},
+            }
+            for record in data
+        ]
+        with self._conn(conn) as c:
+            res = c.execute(stmt, params)
         return res.rowcount
 
+    def update_bulk(
+        self,
+        table_name: str,
+        data: dict | list[dict],
+        on: str | list[str],
+        page_size: int = 1_000,
+        verbose: bool = False,
+        conn: Connection | None = None,
+    ) -> int:
+        if self.engine.dialect.name != 'postgresql':
+            return self.update(table_name, data, on, conn=conn)
+        table = self.get_table(table_name, conn=conn)
+        on = [on] if isinstance(on, str) else on
+        data = [data] if isinstance(data, dict) else data
+        on_set = set(on)
+        columns = on + [k for k in data[0] if k not in on_set]
+        preparer = self.engine.dialect.identifier_preparer
+        quoted = {k: preparer.quote(k) for k in columns}
+        query = f'''
+            UPDATE {preparer.format_table(table)} AS t
+            SET {', '.join(f'{quoted[k]} = v.{quoted[k]}' for k in columns if k not in on_set)}
+            FROM (VALUES %s) AS v({', '.join(quoted.values())})
+            WHERE {' AND '.join(f't.{quoted[k]} = v.{quoted[k]}' for k in on)}
+            RETURNING {', '.join(f't.{quoted[k]}' for k in on)}
+        '''
+        # VALUES rows are untyped, so cast each slot to its column's base type.
+        template = '(' + ', '.join(
+            f'%s::{_cast_type(table.c[k].type).compile(self.engine.dialect)}'
+            for k in columns
+        ) + ')'
+        if verbose:
+            print(query)
+        # psycopg2 gets the values directly, so run SQLAlchemy's bind processors
+        # first, as update() would: JSON is serialized (a list would otherwise go
+        # out as a PG array), Enum and TypeDecorator columns are converted.
+        processors = [
+            table.c[k].type.bind_processor(self.engine.dialect) for k in columns
+        ]
+        rows = [
+            tuple(p(r[k]) if p else r[k] for k, p in zip(columns, processors))
+            for r in data
+        ]
+        with self._conn(conn) as c, c.connection.cursor() as cursor:
+            updated = execute_values(
+                cursor,
+                query,
+                rows,
+                template=template,
+                page_size=page_size,
+                fetch=True,
+            )
+        return len(updated)
+
     def delete(
         self,
         table_name: str,
         where: dict[str, Any] | None = None,
         verbose: bool = False,
+        conn: Connection | None = None,
     ) -> None:
-        table = self.get_table(table_name)
+        table = self.get_table(table_name, conn=conn)
         stmt = delete(table)
         if where:
             stmt = self._where_clause(stmt, table, where)
         if verbose:
-            stmt = stmt.compile(self.engine)
-            print(stmt)
-        with self.engine.connect() as conn:
-            conn.execute(stmt)
-
-    def execute_raw(self, query: str) -> list[dict]:
-        with self.engine.connect() as conn:
-            response = conn.execute(text(query))
-        result = []
-        for row in response.mappings():
-            result.append(dict(row))
-        return result
+            print(stmt.compile(self.engine))
+        with self._conn(conn) as c:
+            c.execute(stmt)
+
+    def execute_raw(
+        self,
+        query: str,
+        result_type: ResultType = 'dict',
+        conn: Connection | None = None,
+    ) -> list[Any]:
+        with self._conn(conn) as c:
+            response = c.execute(text(query))
+            if not response.returns_rows:
+                return []
+            make_row = _row_factory(list(response.keys()), result_type)
+            return [make_row(row) for row in response]
 
 
 if __name__ == '__main__':
@@ -1,27 +1,29 @@
 from typing import Callable
 from functools import wraps
+import logging
 import time
 
 
-def timer(_fn: Callable | None = None, *, text: str | None = None) -> Callable:
-    if _fn is None:
-        def decorator(fn: Callable) -> Callable:
-            @wraps(fn)
-            def wrapper(*args, **kwargs):
-                start_time = time.time()
-                result = fn(*args, **kwargs)
-                print(fn.__qualname__, time.time() - start_time, text or '')
-                return result
-            return wrapper
-        return decorator
-    else:
-        @wraps(_fn)
+def timer(
+    _fn: Callable | None = None,
+    *,
+    text: str | None = None,
+    logger: logging.Logger | None = None,
+) -> Callable:
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            result = _fn(*args, **kwargs)
-            print(_fn.__qualname__, time.time() - start_time, text or '')
-            return result
+            start_time = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter_ns() - start_time) / 1e9
+                if logger is None:
+                    print(fn.__qualname__, elapsed, text or '')
+                else:
+                    logger.debug('%s %.6f %s', fn.__qualname__, elapsed, text or '')
         return wrapper
+    return decorator if _fn is None else decorator(_fn)
 
 
 if __name__ == '__main__':
@@ -32,5 +34,3 @@ if __name__ == '__main__':
 
     f = F()
     f.do(i=8, a=3)
-
-
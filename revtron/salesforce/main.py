@@ -1,22 +1,86 @@
 import inspect
-from datetime import datetime, timedelta
-from typing import Any
-from concurrent.futures import ThreadPoolExecutor
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator
+from collections import deque
+from itertools import islice
+from urllib.parse import quote
+from concurrent.futures import Executor, ThreadPoolExecutor
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def _chunked(iterable: Iterable, n: int) -> Iterator[tuple]:
+    iterator = iter(iterable)
+    while chunk := tuple(islice(iterator, n)):
+        yield chunk
+
+
+def _bounded_map(
+    executor: Executor,
+    fn: Callable,
+    iterable: Iterable,
+    window: int,
+) -> Iterator:
+    # Like Executor.map, but only pulls from iterable as results are consumed,
+    # so at most `window` items are in flight at once.
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _sf_datetime(dt: date | datetime) -> str:
+    # Same output as strftime(Salesforce.DATETIME_FORMAT) without the locale-aware formatter.
+    if not isinstance(dt, datetime):
+        dt = datetime.combine(dt, datetime.min.time())
+    return dt.replace(tzinfo=None).isoformat(timespec='microseconds') + '+0000'
+
+
+def _soql_quote(value: Any) -> str:
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _soql_in(values: Iterable) -> str:
+    return '(' + ', '.join(_soql_quote(v) for v in values) + ')'
 
 
 class Salesforce:
     VERSION = 'v56.0'
     DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f+0000'
     DATE_FORMAT = '%Y-%m-%d'
+    DESCRIBE_TTL = 300
+    MAX_WORKERS = 8
+    COMPOSITE_BATCH_SIZE = 2000
 
     def __init__(self, session_id: str, client_id: str, client_secret: str):
         self.session_id = session_id
         self.client_id = client_id
         self.client_secret = client_secret
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=100,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        ))
         self.refresh_token(session_id, client_id, client_secret)
         self.base_url = f'{self.instance_url}/services/data/{self.VERSION}/'
+        self._query_urls = {
+            True: f'{self.base_url}queryAll/',
+            False: f'{self.base_url}query/',
+        }
+        self._describe_cache: dict[str, tuple[float, Any]] = {}
 
     def __repr__(self) -> str:
         params = {k: getattr(self, k) for k in inspect.signature(self.__init__)\
@@ -35,8 +99,8 @@ class Salesforce:
         data: dict[str, Any] | None = None,
         json: dict[str, Any] | None = None,
         **kwargs
-    ) -> dict[str, Any]:
-        resp = requests.request(
+    ) -> dict[str, Any] | list[Any]:
+        resp = self.session.request(
             method=method,
             url=url,
             headers={
@@ -45,15 +109,15 @@ class Salesforce:
                 **(headers if isinstance(headers, dict) else {})
             } if headers is not False else {},
             params=params,
-            data=data,
-            json=json,
+            data=orjson.dumps(json) if json is not None else data,
+            stream=False,
             **kwargs
         )
         if resp.status_code not in [200, 201, 204]:
             raise Exception(f'Failed to make request: {resp.text}')
         if resp.status_code == 204:
             return {}
-        return resp.json()
+        return orjson.loads(resp.content)
 
     def refresh_token(
         self,
@@ -88,13 +152,31 @@ class Salesforce:
             else:
                 raise Exception('Invalid refresh token')
 
+    def _query_url(self, include_deleted: bool) -> str:
+        return self._query_urls[include_deleted]
+
+    def _cache_get(self, url: str) -> Any | None:
+        # Schema metadata rarely changes, so describe calls are kept for DESCRIBE_TTL.
+        expires_at, value = self._describe_cache.get(url, (0.0, None))
+        return value if expires_at >= time.monotonic() else None
+
+    def _cache_set(self, url: str, value: Any) -> None:
+        self._describe_cache[url] = (time.monotonic() + self.DESCRIBE_TTL, value)
+
+    def _get_cached(self, url: str) -> Any:
+        value = self._cache_get(url)
+        if value is None:
+            value = self.request('GET', url=url)
+            self._cache_set(url, value)
+        return value
+
     @property
     def sobjects(self) -> list[str]:
-        resp = self.request('GET', url=f'{self.base_url}sobjects/')
+        resp = self._get_cached(f'{self.base_url}sobjects/')
         return [sobject['name'] for sobject in resp['sobjects']]
 
     def describe_sobject(self, sobject: str) -> dict[str, Any]:
-        return self.request('GET', url=f'{self.base_url}sobjects/{sobject}/describe/')
+        return self._get_cached(f'{self.base_url}sobjects/{sobject}/describe/')
 
     def get_sobject_columns(self, sobject: str) -> list[str]:
         return [field['name'] for field in self.describe_sobject(sobject)['fields']]
@@ -107,8 +189,8 @@ class Salesforce:
         self,
         sobject: str,
         columns: list[str] | None = None,
-        start_date: datetime | None = None,
-        end_date: datetime | None = None,
+        start_date: date | datetime | None = None,
+        end_date: date | datetime | None = None,
         date_field: str = 'LastModifiedDate',
         limit: int | None = None,
         include_deleted: bool = True,
@@ -123,17 +205,14 @@ class Salesforce:
         query = f"SELECT Id FROM {sobject}"
         # Dates
         if start_date:
-            query += f' WHERE {date_field} >= {start_date.strftime(self.DATETIME_FORMAT)}'
+            query += f' WHERE {date_field} >= {_sf_datetime(start_date)}'
         if end_date:
-            query += f' AND {date_field} <= {end_date.strftime(self.DATETIME_FORMAT)}'
+            query += f' AND {date_field} <= {_sf_datetime(end_date)}'
         # Other filters
         if kwargs:
             for key, value in kwargs.items():
                 operator = 'IN' if isinstance(value, list) else '='
-                if operator == 'IN':
-                    value = tuple(value) if len(value) > 1 else f"('{value[0]}')"
-                else:
-                    value = f"'{value}'"
+                value = _soql_in(value) if operator == 'IN' else _soql_quote(value)
                 query += f' AND {key} {operator} {value}'
         # Query check
         if ' WHERE ' not in query and ' AND ' in query:
@@ -147,48 +226,63 @@ class Salesforce:
         # Query
         resp = self.request(
             'GET',
-            url=f'{self.base_url}{"queryAll" if include_deleted else "query"}/',
+            url=self._query_url(include_deleted),
             params={'q': query},
             headers={'Sforce-Query-Options': 'batchSize=200'}
         )
         total_size = resp['totalSize']
         print(f"Querying {total_size} records from {sobject}.")
-        ids = [r['Id'] for r in resp['records']]
-        while resp['done'] is False:
-            resp = self.request(
-                'GET',
-                url=f"{self.instance_url}{resp['nextRecordsUrl']}",
-                params={'q': query}
-            )
-            ids.extend([r['Id'] for r in resp['records']])
-        # Batching Ids
-        ids = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
         results = []
-        # Building query
-        query_data = f"SELECT {', '.join(columns)} FROM {sobject} WHERE Id IN "
-        query_data = query_data + '{} LIMIT 200'
+        # Composite retrieve only takes the object's own fields (no functions or
+        # relationship paths) and cannot return deleted rows
+        if not include_deleted and all('(' not in c and '.' not in c for c in columns):
+            batch_size = self.COMPOSITE_BATCH_SIZE
+            url = f'{self.base_url}composite/sobjects/{sobject}'
+
+            def fetch(chunk: tuple[str, ...]) -> list[dict]:
+                resp = self.request('POST', url=url, json={'ids': chunk, 'fields': columns})
+                return [record for record in resp if record is not None]
+        else:
+            query_data = f"SELECT {', '.join(columns)} FROM {sobject} WHERE Id IN "
+            query_data = query_data + '{} LIMIT 200'
+            url = self._query_url(include_deleted)
+
+            def fetch(chunk: tuple[str, ...]) -> list[dict]:
+                q = query_data.format(_soql_in(chunk))
+                return self.request('GET', url=url, params={'q': q})['records']
+        # Batching Ids as they are paged in
+        batches = _chunked(self._iter_ids(resp, query), batch_size)
+        workers = max(1, min(self.MAX_WORKERS, -(-total_size // batch_size)))
         # Querying data in batches
-        for chunk in ids:
-            q = query_data.format(
-                tuple(chunk) if len(chunk) > 1 else f"('{chunk[0]}')"
-            )
-            url = f'{self.base_url}{"queryAll" if include_deleted else "query"}/'
-            resp = self.request('GET', url=url, params={'q': q})
-            results += resp['records']
-            print(f"Retrieved {len(results)}/{total_size} records from {sobject}.")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for records in _bounded_map(executor, fetch, batches, workers * 2):
+                results += records
+                print(f"Retrieved {len(results)}/{total_size} records from {sobject}.")
         # Exclude attributes
         if exclude_attributes:
             results = [{k: v for k, v in record.items() if k != 'attributes'} \
                 for record in results]
         return results
 
+    def _iter_ids(self, resp: dict[str, Any], query: str) -> Iterator[str]:
+        while True:
+            for record in resp['records']:
+                yield record['Id']
+            if resp['done'] is not False:
+                break
+            resp = self.request(
+                'GET',
+                url=f"{self.instance_url}{resp['nextRecordsUrl']}",
+                params={'q': query}
+            )
+
     def sobject_size(
         self,
         sobject: str,
         include_deleted: bool = True,
         date_window: int | None = None,
-        start_date: datetime | None = None,
-        end_date: datetime | None = None,
+        start_date: date | datetime | None = None,
+        end_date: date | datetime | None = None,
         date_field: str = 'LastModifiedDate',
         **kwargs
     ) -> dict[str, Any]:
@@ -196,29 +290,43 @@ class Salesforce:
         if date_window is not None:
             start_date = datetime.now() - timedelta(days=date_window)
         if start_date is not None:
-            query += f' WHERE {date_field} >= {start_date.strftime(self.DATETIME_FORMAT)}'
+            query += f' WHERE {date_field} >= {_sf_datetime(start_date)}'
         if end_date is not None:
             operator = 'AND' if start_date is not None else 'WHERE'
-            query += f' {operator} {date_field} <= {end_date.strftime(self.DATETIME_FORMAT)}'
+            query += f' {operator} {date_field} <= {_sf_datetime(end_date)}'
         if kwargs:
             for key, value in kwargs.items():
                 operator = 'IN' if isinstance(value, list) else '='
-                if operator == 'IN':
-                    value = tuple(value) if len(value) > 1 else f"('{value[0]}')"
-                else:
-                    value = f"'{value}'"
+                value = _soql_in(value) if operator == 'IN' else _soql_quote(value)
                 query += f' AND {key} {operator} {value}'
         if ' WHERE ' not in query and ' AND ' in query:
             query = query.replace(' AND ', ' WHERE ', 1)
-        resp = self.request(
-            'GET',
-            url=f'{self.base_url}{"queryAll" if include_deleted else "query"}',
-            params={'q': query}
-        )['records'][0]
+        describe_url = f'{self.base_url}sobjects/{sobject}/describe/'
+        describe = self._cache_get(describe_url)
+        if describe is not None:
+            resp = self.request(
+                'GET',
+                url=self._query_url(include_deleted),
+                params={'q': query}
+            )
+        else:
+            # Send the count query and the describe call in one round-trip
+            endpoint = 'queryAll' if include_deleted else 'query'
+            batch = self.request('POST', url=f'{self.base_url}composite/batch', json={
+                'batchRequests': [
+                    {'method': 'GET', 'url': f'{self.VERSION}/{endpoint}/?q={quote(query)}'},
+                    {'method': 'GET', 'url': f'{self.VERSION}/sobjects/{sobject}/describe/'},
+                ]
+            })
+            if batch['hasErrors']:
+                raise Exception(f'Failed to make request: {batch["results"]}')
+            resp, describe = (r['result'] for r in batch['results'])
+            self._cache_set(describe_url, describe)
+        resp = resp['records'][0]
         rows = resp['expr0']
         min_date = resp['expr1']
         max_date = resp['expr2']
-        columns = len(self.get_sobject_columns(sobject))
+        columns = len(describe['fields'])
         return {
             'sobject': sobject,
             'rows': rows,